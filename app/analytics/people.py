@@ -1,57 +1,67 @@
 import time
 from typing import Dict
 
+import numpy as np
+
+from app.cv.tracker import TrackView
+from app.cv.utils import PERSON_CODE, grow
+
 
 class PeopleAnalytics:
     def __init__(self):
+        # Indexed by track_id (IDs are small, increasing ints); NaN = never seen
         # track_id -> first_seen timestamp
-        self.first_seen: Dict[int, float] = {}
+        self.first_seen = np.full(256, np.nan)
 
         # track_id -> last_seen timestamp
-        self.last_seen: Dict[int, float] = {}
+        self.last_seen = np.full(256, np.nan)
+
+        self._current = 0
+        self._unique = 0
 
-    def update(self, tracks):
+    def update(self, tracks: TrackView):
         """
         Update analytics state using current tracks.
-        Only considers label == 'person'.
+        Only considers visible tracks with the 'person' class code.
         """
         now = time.time()
 
-        for tr in tracks:
-            if tr["label"] != "person":
-                continue
+        ids = tracks.track_id[tracks.visible & (tracks.class_code == PERSON_CODE)]
+        self._current = len(ids)
+        if not len(ids):
+            return
 
-            tid = tr["track_id"]
+        size = int(ids.max()) + 1
+        self.first_seen = grow(self.first_seen, size, np.nan)
+        self.last_seen = grow(self.last_seen, size, np.nan)
 
-            if tid not in self.first_seen:
-                self.first_seen[tid] = now
+        new_ids = ids[np.isnan(self.first_seen[ids])]
+        self.first_seen[new_ids] = now
+        self._unique += len(new_ids)
 
-            self.last_seen[tid] = now
+        self.last_seen[ids] = now
 
     def current_count(self) -> int:
         """
         Number of people currently visible.
         """
-        return len(self.last_seen)
+        return self._current
 
     def unique_count(self) -> int:
         """
         Total unique people seen so far.
         """
-        return len(self.first_seen)
+        return self._unique
 
     def dwell_times(self) -> Dict[int, float]:
         """
         Dwell time per person (seconds).
         """
-        return {
-            tid: self.last_seen[tid] - self.first_seen[tid]
-            for tid in self.first_seen
-            if tid in self.last_seen
-        }
+        seen = np.flatnonzero(~np.isnan(self.first_seen))
+        dwell = self.last_seen[seen] - self.first_seen[seen]
+        return dict(zip(seen.tolist(), dwell.tolist()))
 
     def average_dwell_time(self) -> float:
-        times = self.dwell_times().values()
-        if not times:
+        if not self._unique:
             return 0.0
-        return sum(times) / len(times)
\ No newline at end of file
+        return float(np.nanmean(self.last_seen - self.first_seen))
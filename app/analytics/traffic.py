@@ -1,49 +1,46 @@
-from collections import defaultdict
-from typing import Dict, List
+from typing import Dict
 
+import numpy as np
+
+from app.cv.tracker import TrackView
+from app.cv.utils import CLASS_NAMES, NUM_CLASS_CODES, VEHICLE_CODES, grow
 
-class VehicleAnalytics:
-    VEHICLE_CLASSES = {"car", "truck", "bus", "motorcycle"}
 
+class VehicleAnalytics:
     def __init__(self):
-        # track_id -> label
-        self.active_tracks: Dict[int, str] = {}
+        # Indexed by track_id: whether this vehicle has been counted already
+        self.seen = np.zeros(256, dtype=bool)
 
-        # cumulative unique counts per class
-        self.unique_counts = defaultdict(int)
+        # current / cumulative unique counts, indexed by class code
+        self.current_counts = np.zeros(NUM_CLASS_CODES, dtype=np.int64)
+        self.unique_counts = np.zeros(NUM_CLASS_CODES, dtype=np.int64)
 
-    def update(self, tracks: List[Dict]):
+    def update(self, tracks: TrackView):
         """
         Update vehicle analytics using current tracked objects.
         """
-        current_ids = set()
-
-        for tr in tracks:
-            label = tr["label"]
-            if label not in self.VEHICLE_CLASSES:
-                continue
+        mask = tracks.visible & np.isin(tracks.class_code, VEHICLE_CODES)
+        ids = tracks.track_id[mask]
+        codes = tracks.class_code[mask]
 
-            tid = tr["track_id"]
-            current_ids.add(tid)
+        self.current_counts = np.bincount(codes, minlength=NUM_CLASS_CODES)
+        if not len(ids):
+            return
 
-            if tid not in self.active_tracks:
-                self.active_tracks[tid] = label
-                self.unique_counts[label] += 1
-
-        # Remove inactive tracks
-        self.active_tracks = {
-            tid: lbl for tid, lbl in self.active_tracks.items()
-            if tid in current_ids
-        }
+        self.seen = grow(self.seen, int(ids.max()) + 1, False)
+        new = ~self.seen[ids]
+        self.seen[ids[new]] = True
+        self.unique_counts += np.bincount(codes[new], minlength=NUM_CLASS_CODES)
 
     def current_count(self) -> int:
-        return len(self.active_tracks)
+        return int(self.current_counts.sum())
 
     def current_counts_per_class(self) -> Dict[str, int]:
-        counts = defaultdict(int)
-        for lbl in self.active_tracks.values():
-            counts[lbl] += 1
-        return dict(counts)
+        return {
+            CLASS_NAMES[code]: int(self.current_counts[code])
+            for code in VEHICLE_CODES.tolist()
+            if self.current_counts[code]
+        }
 
     def congestion_level(self) -> str:
         """
@@ -55,4 +52,4 @@ class VehicleAnalytics:
         elif n < 15:
             return "MEDIUM"
         else:
-            return "HIGH"
\ No newline at end of file
+            return "HIGH"
@@ -0,0 +1,62 @@
+from typing import Dict, List
+
+import numpy as np
+
+
+def aggregate_windows(
+    times: np.ndarray,
+    people: np.ndarray,
+    vehicles: np.ndarray,
+    person_first_seen: np.ndarray,
+    vehicle_first_seen: np.ndarray,
+    window_s: float = 60.0,
+) -> List[Dict]:
+    """
+    Per-window aggregates over an analysed video.
+
+    times / people / vehicles: one entry per analysed frame
+        (video time in seconds, people visible, vehicles visible)
+    person_first_seen / vehicle_first_seen: one entry per unique track
+        (video time the track first appeared)
+
+    Returns one row per window with average/peak visible counts and the
+    number of new people/vehicles first seen in that window.
+    """
+    if not len(times):
+        return []
+
+    n_windows = int(times.max() // window_s) + 1
+
+    frame_win = (times // window_s).astype(int)
+    frames = np.bincount(frame_win, minlength=n_windows)
+    people_sum = np.bincount(frame_win, weights=people, minlength=n_windows)
+    vehicles_sum = np.bincount(frame_win, weights=vehicles, minlength=n_windows)
+
+    people_max = np.zeros(n_windows, dtype=int)
+    vehicles_max = np.zeros(n_windows, dtype=int)
+    np.maximum.at(people_max, frame_win, people.astype(int))
+    np.maximum.at(vehicles_max, frame_win, vehicles.astype(int))
+
+    new_people = np.bincount(
+        (person_first_seen // window_s).astype(int), minlength=n_windows
+    )[:n_windows]
+    new_vehicles = np.bincount(
+        (vehicle_first_seen // window_s).astype(int), minlength=n_windows
+    )[:n_windows]
+
+    rows = []
+    for w in range(n_windows):
+        n = max(int(frames[w]), 1)
+        rows.append({
+            "window_start_s": w * window_s,
+            "window_end_s": (w + 1) * window_s,
+            "frames": int(frames[w]),
+            "people_avg": float(people_sum[w] / n),
+            "people_max": int(people_max[w]),
+            "people_new": int(new_people[w]),
+            "vehicles_avg": float(vehicles_sum[w] / n),
+            "vehicles_max": int(vehicles_max[w]),
+            "vehicles_new": int(new_vehicles[w]),
+        })
+
+    return rows
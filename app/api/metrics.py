@@ -1,5 +1,6 @@
 from fastapi import APIRouter
 from app.core.state import STATE
+from app.cv.inference import inference_stats
 
 router = APIRouter()
 
@@ -10,4 +11,9 @@ def get_metrics():
         "running": STATE["running"],
         "people": STATE["people"],
         "vehicles": STATE["vehicles"],
-    }
\ No newline at end of file
+    }
+
+
+@router.get("/metrics/inference")
+def get_inference_metrics():
+    return inference_stats()
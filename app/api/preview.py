@@ -0,0 +1,43 @@
+import asyncio
+
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
+
+from app.core.preview import get_preview
+
+router = APIRouter()
+
+BOUNDARY = "frame"
+
+
+@router.get("/preview/{stream_id}")
+async def preview_stream(stream_id: str):
+    """
+    MJPEG preview of the annotated feed (use as an <img> src).
+    Rendering only runs while at least one viewer is connected.
+    """
+    hub = get_preview(stream_id)
+    if hub is None:
+        raise HTTPException(status_code=404, detail=f"Unknown stream: {stream_id}")
+
+    async def frames():
+        hub.add_viewer()
+        try:
+            seq = -1
+            while True:
+                if hub.seq != seq and hub.jpeg is not None:
+                    seq = hub.seq
+                    jpeg = hub.jpeg
+                    yield (
+                        f"--{BOUNDARY}\r\n"
+                        "Content-Type: image/jpeg\r\n"
+                        f"Content-Length: {len(jpeg)}\r\n\r\n"
+                    ).encode() + jpeg + b"\r\n"
+                await asyncio.sleep(0.5 / hub.fps)
+        finally:
+            hub.remove_viewer()
+
+    return StreamingResponse(
+        frames(),
+        media_type=f"multipart/x-mixed-replace; boundary={BOUNDARY}",
+    )
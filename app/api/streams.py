@@ -1,4 +1,4 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Query
 from app.workers.video_worker import VideoWorker
 
 router = APIRouter()
@@ -6,8 +6,18 @@ worker = VideoWorker()
 
 
 @router.post("/start")
-def start_stream(video_path: str = "data/videos/input_video.mp4"):
-    worker.start(video_path)
+def start_stream(
+    video_path: str = "data/videos/input_video.mp4",
+    preview_fps: float = Query(5.0, gt=0),
+    preview_width: int = Query(640, gt=0),
+    preview_quality: int = Query(70, ge=1, le=100),
+):
+    worker.start(
+        video_path,
+        preview_fps=preview_fps,
+        preview_width=preview_width,
+        preview_quality=preview_quality,
+    )
     return {"status": "started", "video": video_path}
 
 
@@ -0,0 +1,166 @@
+import threading
+import time
+from typing import Dict, Optional
+
+import cv2
+import numpy as np
+
+from app.cv.overlay import draw_overlay
+
+
+class PreviewHub:
+    """
+    Annotated JPEG preview of one stream, shared by all its viewers.
+
+    - the pipeline calls publish() every processed frame; it returns
+      immediately while nobody is watching
+    - overlay rendering and JPEG encoding run in a worker thread that only
+      exists while at least one viewer is connected
+    - output is capped at `fps` and `max_width`, and every viewer reads
+      the same encoded frame
+    """
+
+    def __init__(self, fps: float = 5.0, max_width: int = 640, jpeg_quality: int = 70):
+        self.fps = fps
+        self.max_width = max_width
+        self.jpeg_quality = jpeg_quality
+
+        self.viewers = 0
+
+        # Latest encoded frame (read by viewers)
+        self.jpeg: Optional[bytes] = None
+        self.seq = 0
+
+        self._lock = threading.Lock()
+        # Bumped when viewing restarts, so renders from an earlier
+        # session are never shown to new viewers
+        self._session = 0
+        self._pending = None
+        self._new_frame = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._last_publish = 0.0
+
+    # ------------------------------------------------------------------
+    # Pipeline side
+    # ------------------------------------------------------------------
+    def publish(self, frame: np.ndarray, tracks, people: Dict, vehicles: Dict):
+        """
+        Hand a frame and its tracks to the preview worker.
+        """
+        if not self.viewers:
+            return
+
+        now = time.monotonic()
+        if now - self._last_publish < 1.0 / self.fps:
+            return
+        self._last_publish = now
+
+        # Copy what the worker needs: track views and the frame are
+        # reused/modified by the pipeline after this call returns
+        visible = tracks.visible
+        with self._lock:
+            self._pending = (
+                frame.copy(),
+                tracks.bbox[visible],
+                tracks.class_code[visible],
+                tracks.track_id[visible],
+                people,
+                vehicles,
+            )
+        self._new_frame.set()
+
+    # ------------------------------------------------------------------
+    # Viewer side
+    # ------------------------------------------------------------------
+    def add_viewer(self):
+        with self._lock:
+            if not self.viewers:
+                self._session += 1
+                self._pending = None
+                self.jpeg = None
+            self.viewers += 1
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.start()
+
+    def remove_viewer(self):
+        with self._lock:
+            self.viewers = max(self.viewers - 1, 0)
+        # Wake the worker so it can exit once nobody is left
+        self._new_frame.set()
+
+    # ------------------------------------------------------------------
+    # Worker
+    # ------------------------------------------------------------------
+    def _render(self, frame, bbox, class_code, track_id, people, vehicles) -> bytes:
+        h, w = frame.shape[:2]
+        if w > self.max_width:
+            scale = self.max_width / w
+            frame = cv2.resize(
+                frame, (self.max_width, int(h * scale)), interpolation=cv2.INTER_AREA
+            )
+            bbox = (bbox * scale).astype(int)
+
+        draw_overlay(frame, bbox, class_code, track_id, people, vehicles)
+
+        ok, buf = cv2.imencode(
+            ".jpg", frame, [int(cv2.IMWRITE_JPEG_QUALITY), self.jpeg_quality]
+        )
+        return buf.tobytes() if ok else b""
+
+    def _run(self):
+        while True:
+            self._new_frame.wait(timeout=1.0)
+            self._new_frame.clear()
+
+            with self._lock:
+                if not self.viewers:
+                    # Drop state nobody needs any more
+                    self._thread = None
+                    self._pending = None
+                    self.jpeg = None
+                    return
+                pending, self._pending = self._pending, None
+                session = self._session
+
+            if pending is None:
+                continue
+
+            jpeg = self._render(*pending)
+            with self._lock:
+                if jpeg and self.viewers and session == self._session:
+                    self.jpeg = jpeg
+                    self.seq += 1
+
+
+_hubs: Dict[str, PreviewHub] = {}
+_hubs_lock = threading.Lock()
+
+
+def register_preview(
+    stream_id: str = "default",
+    fps: float = 5.0,
+    max_width: int = 640,
+    jpeg_quality: int = 70,
+) -> PreviewHub:
+    """
+    Preview hub for a stream the caller publishes to, created on first use.
+    Re-registering an existing stream applies the new settings to its hub.
+    """
+    with _hubs_lock:
+        hub = _hubs.get(stream_id)
+        if hub is None:
+            hub = _hubs[stream_id] = PreviewHub(fps, max_width, jpeg_quality)
+        else:
+            hub.fps = fps
+            hub.max_width = max_width
+            hub.jpeg_quality = jpeg_quality
+        return hub
+
+
+def get_preview(stream_id: str = "default") -> Optional[PreviewHub]:
+    """
+    Preview hub of a registered stream, or None.
+    """
+    with _hubs_lock:
+        return _hubs.get(stream_id)
@@ -1,7 +1,12 @@
+from typing import List
+
+import numpy as np
 import torch
 import torchvision
 from torchvision.transforms import functional as F
 
+from app.cv.utils import CLASS_NAMES, Detections
+
 
 class ObjectDetector:
     def __init__(self, score_threshold: float = 0.5):
@@ -17,44 +22,39 @@ class ObjectDetector:
         self.score_threshold = score_threshold
 
         # COCO class names (partial, enough for traffic)
-        self.class_names = {
-            1: "person",
-            2: "bicycle",
-            3: "car",
-            4: "motorcycle",
-            6: "bus",
-            8: "truck",
-        }
-
-    def detect(self, frame):
+        self.class_names = CLASS_NAMES
+        self._class_ids = torch.tensor(sorted(CLASS_NAMES), device=self.device)
+
+    def detect(self, frame) -> Detections:
         """
         Run object detection on a single frame (OpenCV BGR image)
         """
-        # Convert BGR (OpenCV) -> RGB
-        frame_rgb = frame[:, :, ::-1].copy()
+        return self.detect_batch([frame])[0]
 
-        # Convert to tensor
-        image_tensor = F.to_tensor(frame_rgb).to(self.device)
+    def detect_batch(self, frames: List) -> List[Detections]:
+        """
+        Run object detection on several frames (OpenCV BGR images)
+        in a single forward pass. Frames may differ in size.
+        """
+        # Convert BGR (OpenCV) -> RGB -> tensor
+        image_tensors = [
+            F.to_tensor(frame[:, :, ::-1].copy()).to(self.device)
+            for frame in frames
+        ]
 
         with torch.no_grad():
-            outputs = self.model([image_tensor])[0]
+            outputs = self.model(image_tensors)
 
-        detections = []
+        return [self._to_detections(out) for out in outputs]
 
-        for box, label, score in zip(
-            outputs["boxes"], outputs["labels"], outputs["scores"]
-        ):
-            if score < self.score_threshold:
-                continue
-
-            label_id = label.item()
-            if label_id not in self.class_names:
-                continue
-
-            detections.append({
-                "bbox": box.cpu().numpy().astype(int),
-                "label": self.class_names[label_id],
-                "score": float(score),
-            })
+    def _to_detections(self, outputs) -> Detections:
+        # Filter by score and class in one pass, keep results column-wise
+        keep = (outputs["scores"] >= self.score_threshold) & torch.isin(
+            outputs["labels"], self._class_ids
+        )
 
-        return detections
\ No newline at end of file
+        return Detections(
+            bbox=outputs["boxes"][keep].cpu().numpy().astype(np.int32),
+            class_code=outputs["labels"][keep].cpu().numpy().astype(np.int16),
+            score=outputs["scores"][keep].cpu().numpy().astype(np.float32),
+        )
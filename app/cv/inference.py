@@ -0,0 +1,270 @@
+import queue
+import threading
+import time
+from collections import Counter, deque
+from concurrent.futures import Future
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+from app.cv.utils import Detections
+
+
+@dataclass
+class _Request:
+    frame: np.ndarray
+    deadline: float
+    submitted: float = field(default_factory=time.monotonic)
+    future: Future = field(default_factory=Future)
+
+
+class InferenceServer:
+    """
+    Shared detector for all streams (one model in RAM, one forward pass
+    at a time).
+
+    - pipelines submit frames from their own threads
+    - frames are batched across streams up to `max_batch_size`, waiting
+      at most `max_wait_ms` for a batch to fill; the wait is skipped when
+      no other registered stream could contribute (see client())
+    - each request carries a deadline; requests that expire while queued
+      fail with TimeoutError instead of being run late
+    - results are delivered per request through a Future
+    """
+
+    def __init__(
+        self,
+        detector_factory: Optional[Callable] = None,
+        max_batch_size: int = 4,
+        max_wait_ms: float = 20.0,
+        default_timeout: float = 2.0,
+        result_margin: float = 10.0,
+        stats_window: int = 1000,
+    ):
+        if detector_factory is None:
+            from app.cv.detector import ObjectDetector
+
+            def detector_factory():
+                return ObjectDetector(score_threshold=0.6)
+
+        self.detector_factory = detector_factory
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.default_timeout = default_timeout
+        self.result_margin = result_margin
+        self.clients = 0
+
+        self._detector = None
+        self._queue: "queue.Queue[_Request]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+        # Stats (guarded by _lock)
+        self._lock = threading.Lock()
+        self._batch_sizes: Counter = Counter()
+        self._queue_delays: deque = deque(maxlen=stats_window)
+        self._served = 0
+        self._expired = 0
+        self._failed = 0
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+
+        # Load the model up front so early requests don't expire behind it
+        if self._detector is None:
+            self._detector = self.detector_factory()
+
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+        # Fail anything still waiting so callers don't hang
+        while True:
+            try:
+                req = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if req.future.set_running_or_notify_cancel():
+                req.future.set_exception(RuntimeError("Inference server stopped"))
+
+    # ------------------------------------------------------------------
+    # Client API
+    # ------------------------------------------------------------------
+    @contextmanager
+    def client(self):
+        """
+        Register a stream for the duration of the block. The server only
+        waits for a batch to fill while more streams are registered than
+        requests are in the batch.
+        """
+        with self._lock:
+            self.clients += 1
+        try:
+            yield self
+        finally:
+            with self._lock:
+                self.clients -= 1
+
+    def submit(self, frame: np.ndarray, timeout: Optional[float] = None) -> Future:
+        """
+        Queue a frame for detection. The returned Future resolves to
+        Detections, or raises TimeoutError if the deadline passes first.
+        """
+        if self._stop.is_set() or self._thread is None:
+            raise RuntimeError("Inference server is not running")
+
+        if timeout is None:
+            timeout = self.default_timeout
+
+        req = _Request(frame=frame, deadline=time.monotonic() + timeout)
+        self._queue.put(req)
+        return req.future
+
+    def detect(self, frame: np.ndarray, timeout: Optional[float] = None) -> Detections:
+        """
+        Blocking drop-in for ObjectDetector.detect.
+        Waits for the deadline plus `result_margin` (time to run the
+        batch) so a stopped or dead server cannot block the caller forever.
+        """
+        if timeout is None:
+            timeout = self.default_timeout
+
+        future = self.submit(frame, timeout)
+        try:
+            return future.result(timeout=timeout + self.result_margin)
+        except FutureTimeoutError:
+            future.cancel()
+            raise TimeoutError("Inference result not ready in time")
+
+    def stats(self) -> Dict:
+        with self._lock:
+            delays = np.array(self._queue_delays, dtype=float) * 1000.0
+            return {
+                "running": self._thread is not None and self._thread.is_alive(),
+                "clients": self.clients,
+                "queued": self._queue.qsize(),
+                "served": self._served,
+                "expired": self._expired,
+                "failed": self._failed,
+                "batch_sizes": dict(sorted(self._batch_sizes.items())),
+                "queue_delay_ms": {
+                    "avg": float(delays.mean()) if len(delays) else 0.0,
+                    "p95": float(np.percentile(delays, 95)) if len(delays) else 0.0,
+                    "max": float(delays.max()) if len(delays) else 0.0,
+                },
+            }
+
+    # ------------------------------------------------------------------
+    # Server loop
+    # ------------------------------------------------------------------
+    def _next_batch(self) -> List[_Request]:
+        try:
+            first = self._queue.get(timeout=0.1)
+        except queue.Empty:
+            return []
+
+        # The wait window starts now, not when `first` was queued: requests
+        # queued during the previous forward pass would otherwise never
+        # wait for the streams about to resubmit, and batches stay split
+        batch = [first]
+        batch_deadline = min(time.monotonic() + self.max_wait, first.deadline)
+
+        while len(batch) < self.max_batch_size:
+            # Take whatever is already queued, only wait while time remains
+            # and another registered stream could still fill the batch
+            try:
+                req = self._queue.get_nowait()
+            except queue.Empty:
+                if self.clients <= len(batch):
+                    break
+                remaining = batch_deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    req = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+            batch.append(req)
+            batch_deadline = min(batch_deadline, req.deadline)
+
+        return batch
+
+    def _run(self):
+        while not self._stop.is_set():
+            batch = self._next_batch()
+            if not batch:
+                continue
+
+            # Drop requests whose deadline already passed
+            now = time.monotonic()
+            live = []
+            for req in batch:
+                if req.future.set_running_or_notify_cancel() is False:
+                    continue
+                if req.deadline < now:
+                    req.future.set_exception(TimeoutError("Inference deadline exceeded"))
+                    with self._lock:
+                        self._expired += 1
+                    continue
+                live.append(req)
+
+            if not live:
+                continue
+
+            with self._lock:
+                self._batch_sizes[len(live)] += 1
+                self._queue_delays.extend(now - req.submitted for req in live)
+
+            try:
+                results = self._detector.detect_batch([req.frame for req in live])
+            except Exception as exc:
+                for req in live:
+                    req.future.set_exception(exc)
+                with self._lock:
+                    self._failed += len(live)
+                continue
+
+            for req, detections in zip(live, results):
+                req.future.set_result(detections)
+
+            with self._lock:
+                self._served += len(live)
+
+
+_server: Optional[InferenceServer] = None
+_server_lock = threading.Lock()
+
+
+def get_inference_server() -> InferenceServer:
+    """
+    Process-wide shared inference server, started on first use.
+    """
+    global _server
+    with _server_lock:
+        if _server is None:
+            _server = InferenceServer()
+        _server.start()
+        return _server
+
+
+def inference_stats() -> Dict:
+    """
+    Stats of the shared server, without starting it (or loading the model).
+    """
+    with _server_lock:
+        if _server is None:
+            return {"running": False}
+        return _server.stats()
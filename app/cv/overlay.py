@@ -0,0 +1,112 @@
+from typing import Dict
+
+import cv2
+import numpy as np
+
+from app.cv.utils import CLASS_NAMES
+
+
+def draw_overlay(
+    frame: np.ndarray,
+    bbox: np.ndarray,
+    class_code: np.ndarray,
+    track_id: np.ndarray,
+    people: Dict,
+    vehicles: Dict,
+):
+    """
+    Draw tracked objects and analytics onto `frame` (in place).
+
+    bbox / class_code / track_id: columns of the tracks to draw
+    people / vehicles: analytics dicts as reported by the pipeline
+    """
+    # ------------------------------------------------------------------
+    # Tracked objects
+    # ------------------------------------------------------------------
+    for (x1, y1, x2, y2), code, tid in zip(
+        bbox.tolist(), class_code.tolist(), track_id.tolist()
+    ):
+        label = CLASS_NAMES[code]
+
+        cv2.rectangle(frame, (x1, y1), (x2, y2), (0, 255, 0), 1)
+        cv2.putText(
+            frame,
+            f"{label} #{tid}",
+            (x1, max(15, y1 - 6)),
+            cv2.FONT_HERSHEY_SIMPLEX,
+            0.6,
+            (0, 255, 0),
+            1,
+        )
+
+    # ------------------------------------------------------------------
+    # People analytics
+    # ------------------------------------------------------------------
+    cv2.putText(
+        frame,
+        f"People now: {people['current']}",
+        (20, 30),
+        cv2.FONT_HERSHEY_SIMPLEX,
+        0.8,
+        (255, 255, 0),
+        2,
+    )
+
+    cv2.putText(
+        frame,
+        f"Unique people: {people['unique']}",
+        (20, 60),
+        cv2.FONT_HERSHEY_SIMPLEX,
+        0.8,
+        (255, 255, 0),
+        2,
+    )
+
+    cv2.putText(
+        frame,
+        f"Avg dwell: {people['avg_dwell']:.1f}s",
+        (20, 90),
+        cv2.FONT_HERSHEY_SIMPLEX,
+        0.8,
+        (255, 255, 0),
+        2,
+    )
+
+    # ------------------------------------------------------------------
+    # Vehicle analytics
+    # ------------------------------------------------------------------
+    congestion = vehicles["congestion"]
+
+    y = 130
+    cv2.putText(
+        frame,
+        f"Vehicles now: {vehicles['current']}",
+        (20, y),
+        cv2.FONT_HERSHEY_SIMPLEX,
+        0.8,
+        (0, 200, 255),
+        2,
+    )
+
+    y += 30
+    for cls, cnt in vehicles["per_class"].items():
+        cv2.putText(
+            frame,
+            f"{cls.capitalize()}: {cnt}",
+            (20, y),
+            cv2.FONT_HERSHEY_SIMPLEX,
+            0.7,
+            (0, 200, 255),
+            2,
+        )
+        y += 25
+
+    cv2.putText(
+        frame,
+        f"Congestion: {congestion}",
+        (20, y + 10),
+        cv2.FONT_HERSHEY_SIMPLEX,
+        0.8,
+        (0, 0, 255) if congestion == "HIGH" else (0, 255, 255),
+        2,
+    )
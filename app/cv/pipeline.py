@@ -3,6 +3,7 @@ from pathlib import Path
 
 from app.cv.detector import ObjectDetector
 from app.cv.tracker import IoUTracker
+from app.cv.overlay import draw_overlay
 from app.analytics.people import PeopleAnalytics
 from app.analytics.traffic import VehicleAnalytics
 
@@ -11,6 +12,9 @@ def run_video_pipeline(
     video_path: str,
     target_fps: int = 5,
     on_update=None,
+    detector=None,
+    preview=None,
+    display: bool = True,
 ):
     """
     Offline video pipeline (callable from a background worker):
@@ -21,7 +25,8 @@ def run_video_pipeline(
     - Compute people analytics (count, dwell time)
     - Compute vehicle analytics (counts, congestion proxy)
     - Optionally report analytics via callback (FastAPI integration)
-    - Visualize results (OpenCV window)
+    - Optionally publish frames to the browser preview
+    - Visualize results (local OpenCV window, optional)
 
     Parameters
     ----------
@@ -32,6 +37,15 @@ def run_video_pipeline(
     on_update : callable or None
         Callback function receiving analytics dicts:
         on_update(people={...}, vehicles={...})
+    detector : ObjectDetector, InferenceServer or None
+        Anything with a detect(frame) method. Pass the shared
+        InferenceServer when several streams run at once; by default
+        a private ObjectDetector is loaded.
+    preview : PreviewHub or None
+        Browser preview for this stream; frames are only handed over
+        while at least one viewer is connected.
+    display : bool
+        Show the annotated feed in a local OpenCV window.
     """
 
     # ------------------------------------------------------------------
@@ -55,7 +69,8 @@ def run_video_pipeline(
     # ------------------------------------------------------------------
     # Core components
     # ------------------------------------------------------------------
-    detector = ObjectDetector(score_threshold=0.6)
+    if detector is None:
+        detector = ObjectDetector(score_threshold=0.6)
     tracker = IoUTracker(iou_threshold=0.3, max_age=20)
 
     people_analytics = PeopleAnalytics()
@@ -77,7 +92,12 @@ def run_video_pipeline(
             # ----------------------------------------------------------
             # Detection
             # ----------------------------------------------------------
-            detections = detector.detect(frame)
+            try:
+                detections = detector.detect(frame)
+            except TimeoutError:
+                # Shared inference server missed the deadline: drop frame
+                frame_count += 1
+                continue
 
             # ----------------------------------------------------------
             # Tracking
@@ -90,123 +110,46 @@ def run_video_pipeline(
             people_analytics.update(tracks)
             vehicle_analytics.update(tracks)
 
+            people = {
+                "current": people_analytics.current_count(),
+                "unique": people_analytics.unique_count(),
+                "avg_dwell": people_analytics.average_dwell_time(),
+            }
+            vehicles = {
+                "current": vehicle_analytics.current_count(),
+                "per_class": vehicle_analytics.current_counts_per_class(),
+                "congestion": vehicle_analytics.congestion_level(),
+            }
+
             # ----------------------------------------------------------
             # Report analytics to FastAPI (if callback provided)
             # ----------------------------------------------------------
             if on_update is not None:
-                on_update(
-                    people={
-                        "current": people_analytics.current_count(),
-                        "unique": people_analytics.unique_count(),
-                        "avg_dwell": people_analytics.average_dwell_time(),
-                    },
-                    vehicles={
-                        "current": vehicle_analytics.current_count(),
-                        "per_class": vehicle_analytics.current_counts_per_class(),
-                        "congestion": vehicle_analytics.congestion_level(),
-                    },
-                )
+                on_update(people=people, vehicles=vehicles)
 
             # ----------------------------------------------------------
-            # Draw tracked objects
+            # Browser preview (no-op while nobody is watching)
             # ----------------------------------------------------------
-            for tr in tracks:
-                x1, y1, x2, y2 = tr["bbox"]
-                label = tr["label"]
-                tid = tr["track_id"]
-
-                cv2.rectangle(frame, (x1, y1), (x2, y2), (0, 255, 0), 1)
-                cv2.putText(
-                    frame,
-                    f"{label} #{tid}",
-                    (x1, max(15, y1 - 6)),
-                    cv2.FONT_HERSHEY_SIMPLEX,
-                    0.6,
-                    (0, 255, 0),
-                    1,
-                )
+            if preview is not None:
+                preview.publish(frame, tracks, people, vehicles)
 
             # ----------------------------------------------------------
-            # People analytics overlay
+            # Local display
             # ----------------------------------------------------------
-            cv2.putText(
-                frame,
-                f"People now: {people_analytics.current_count()}",
-                (20, 30),
-                cv2.FONT_HERSHEY_SIMPLEX,
-                0.8,
-                (255, 255, 0),
-                2,
-            )
-
-            cv2.putText(
-                frame,
-                f"Unique people: {people_analytics.unique_count()}",
-                (20, 60),
-                cv2.FONT_HERSHEY_SIMPLEX,
-                0.8,
-                (255, 255, 0),
-                2,
-            )
-
-            cv2.putText(
-                frame,
-                f"Avg dwell: {people_analytics.average_dwell_time():.1f}s",
-                (20, 90),
-                cv2.FONT_HERSHEY_SIMPLEX,
-                0.8,
-                (255, 255, 0),
-                2,
-            )
-
-            # ----------------------------------------------------------
-            # Vehicle analytics overlay
-            # ----------------------------------------------------------
-            vehicle_total = vehicle_analytics.current_count()
-            vehicle_counts = vehicle_analytics.current_counts_per_class()
-            congestion = vehicle_analytics.congestion_level()
-
-            y = 130
-            cv2.putText(
-                frame,
-                f"Vehicles now: {vehicle_total}",
-                (20, y),
-                cv2.FONT_HERSHEY_SIMPLEX,
-                0.8,
-                (0, 200, 255),
-                2,
-            )
-
-            y += 30
-            for cls, cnt in vehicle_counts.items():
-                cv2.putText(
+            if display:
+                visible = tracks.visible
+                draw_overlay(
                     frame,
-                    f"{cls.capitalize()}: {cnt}",
-                    (20, y),
-                    cv2.FONT_HERSHEY_SIMPLEX,
-                    0.7,
-                    (0, 200, 255),
-                    2,
+                    tracks.bbox[visible],
+                    tracks.class_code[visible],
+                    tracks.track_id[visible],
+                    people,
+                    vehicles,
                 )
-                y += 25
-
-            cv2.putText(
-                frame,
-                f"Congestion: {congestion}",
-                (20, y + 10),
-                cv2.FONT_HERSHEY_SIMPLEX,
-                0.8,
-                (0, 0, 255) if congestion == "HIGH" else (0, 255, 255),
-                2,
-            )
-
-            # ----------------------------------------------------------
-            # Display
-            # ----------------------------------------------------------
-            cv2.imshow("Smart Traffic & Crowd Analytics", frame)
+                cv2.imshow("Smart Traffic & Crowd Analytics", frame)
 
-            if cv2.waitKey(1) & 0xFF == ord("q"):
-                break
+                if cv2.waitKey(1) & 0xFF == ord("q"):
+                    break
 
         frame_count += 1
 
@@ -214,5 +157,6 @@ def run_video_pipeline(
     # Cleanup
     # ------------------------------------------------------------------
     cap.release()
-    cv2.destroyAllWindows()
+    if display:
+        cv2.destroyAllWindows()
     print("[INFO] Pipeline finished.")
\ No newline at end of file
@@ -1,38 +1,102 @@
-from dataclasses import dataclass
-from typing import List, Dict, Tuple, Optional
+from typing import NamedTuple
 import numpy as np
 
+from app.cv.utils import Detections, grow
 
-def iou_xyxy(a: np.ndarray, b: np.ndarray) -> float:
-    """IoU for boxes in [x1,y1,x2,y2]"""
-    ax1, ay1, ax2, ay2 = a
-    bx1, by1, bx2, by2 = b
 
-    inter_x1 = max(ax1, bx1)
-    inter_y1 = max(ay1, by1)
-    inter_x2 = min(ax2, bx2)
-    inter_y2 = min(ay2, by2)
+def iou_matrix(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """IoU matrix (len(a) x len(b)) for boxes in [x1,y1,x2,y2]"""
+    a = a.astype(float)
+    b = b.astype(float)
 
-    inter_w = max(0, inter_x2 - inter_x1)
-    inter_h = max(0, inter_y2 - inter_y1)
+    inter_w = np.clip(
+        np.minimum(a[:, None, 2], b[None, :, 2]) - np.maximum(a[:, None, 0], b[None, :, 0]),
+        0, None,
+    )
+    inter_h = np.clip(
+        np.minimum(a[:, None, 3], b[None, :, 3]) - np.maximum(a[:, None, 1], b[None, :, 1]),
+        0, None,
+    )
     inter_area = inter_w * inter_h
 
-    area_a = max(0, ax2 - ax1) * max(0, ay2 - ay1)
-    area_b = max(0, bx2 - bx1) * max(0, by2 - by1)
+    area_a = np.clip(a[:, 2] - a[:, 0], 0, None) * np.clip(a[:, 3] - a[:, 1], 0, None)
+    area_b = np.clip(b[:, 2] - b[:, 0], 0, None) * np.clip(b[:, 3] - b[:, 1], 0, None)
 
-    union = area_a + area_b - inter_area
-    if union <= 0:
-        return 0.0
-    return inter_area / union
+    union = area_a[:, None] + area_b[None, :] - inter_area
+    return np.divide(inter_area, union, out=np.zeros_like(union), where=union > 0)
 
 
-@dataclass
-class Track:
-    track_id: int
-    label: str
-    bbox: np.ndarray  # xyxy
-    hits: int = 1
-    time_since_update: int = 0
+class TrackView(NamedTuple):
+    """
+    Zero-copy views over the live rows of a TrackTable.
+    Only valid until the next tracker update.
+    """
+    track_id: np.ndarray          # (N,) int64
+    class_code: np.ndarray        # (N,) int16
+    bbox: np.ndarray              # (N, 4) int32 xyxy
+    hits: np.ndarray              # (N,) int32
+    time_since_update: np.ndarray  # (N,) int32
+    visible: np.ndarray           # (N,) bool, seen recently enough to report
+
+
+class TrackTable:
+    """
+    Structure-of-arrays track storage.
+    Live tracks always occupy rows [0, size); removing tracks compacts the
+    remaining rows so freed slots are reused by the next new tracks.
+    """
+
+    def __init__(self, capacity: int = 64):
+        self.size = 0
+        self.track_id = np.zeros(capacity, dtype=np.int64)
+        self.class_code = np.zeros(capacity, dtype=np.int16)
+        self.bbox = np.zeros((capacity, 4), dtype=np.int32)
+        self.hits = np.zeros(capacity, dtype=np.int32)
+        self.time_since_update = np.zeros(capacity, dtype=np.int32)
+
+    def add(self, track_ids: np.ndarray, class_codes: np.ndarray, bboxes: np.ndarray):
+        k = len(track_ids)
+        if k == 0:
+            return
+
+        end = self.size + k
+        if end > len(self.track_id):
+            self.track_id = grow(self.track_id, end)
+            self.class_code = grow(self.class_code, end)
+            self.bbox = grow(self.bbox, end)
+            self.hits = grow(self.hits, end)
+            self.time_since_update = grow(self.time_since_update, end)
+
+        rows = slice(self.size, end)
+        self.track_id[rows] = track_ids
+        self.class_code[rows] = class_codes
+        self.bbox[rows] = bboxes
+        self.hits[rows] = 1
+        self.time_since_update[rows] = 0
+        self.size = end
+
+    def remove(self, mask: np.ndarray):
+        """Drop live rows where mask is True (mask covers rows [0, size))."""
+        if not mask.any():
+            return
+
+        keep = ~mask
+        n = int(keep.sum())
+        for col in (self.track_id, self.class_code, self.bbox, self.hits, self.time_since_update):
+            col[:n] = col[: self.size][keep]
+        self.size = n
+
+    def view(self, max_report_age: int = 2) -> TrackView:
+        n = self.size
+        time_since_update = self.time_since_update[:n]
+        return TrackView(
+            track_id=self.track_id[:n],
+            class_code=self.class_code[:n],
+            bbox=self.bbox[:n],
+            hits=self.hits[:n],
+            time_since_update=time_since_update,
+            visible=time_since_update <= max_report_age,
+        )
 
 
 class IoUTracker:
@@ -46,102 +110,60 @@ class IoUTracker:
         self.iou_threshold = iou_threshold
         self.max_age = max_age
         self._next_id = 1
-        self.tracks: Dict[int, Track] = {}
+        self.tracks = TrackTable()
 
-    def _new_track(self, label: str, bbox: np.ndarray) -> Track:
-        tid = self._next_id
-        self._next_id += 1
-        tr = Track(track_id=tid, label=label, bbox=bbox.copy())
-        self.tracks[tid] = tr
-        return tr
-
-    def update(self, detections: List[Dict]) -> List[Dict]:
+    def update(self, detections: Detections) -> TrackView:
         """
-        detections: list of {"bbox": np.array/int list xyxy, "label": str, "score": float}
-        returns: list of dicts with track info:
-                 {"track_id", "label", "bbox", "score"}
+        detections: Detections columns (bbox xyxy, class_code, score)
+        returns: TrackView over the track table; consumers should honour
+                 the `visible` mask (tracks seen in the last few frames)
         """
+        table = self.tracks
+        n = table.size
 
         # Age all tracks (assume they were not updated yet)
-        for tr in self.tracks.values():
-            tr.time_since_update += 1
-
-        # Group detections by label
-        dets_by_label: Dict[str, List[Tuple[np.ndarray, float]]] = {}
-        for d in detections:
-            bbox = np.array(d["bbox"], dtype=int)
-            dets_by_label.setdefault(d["label"], []).append((bbox, float(d["score"])))
-
-        # Match per label (class-aware)
-        for label, det_list in dets_by_label.items():
-            # Existing tracks for this label
-            track_ids = [tid for tid, tr in self.tracks.items() if tr.label == label]
-            if not track_ids:
-                for bbox, _score in det_list:
-                    self._new_track(label, bbox)
-                continue
-
-            track_boxes = np.array([self.tracks[tid].bbox for tid in track_ids], dtype=float)
-            det_boxes = np.array([b for b, _s in det_list], dtype=float)
-
-            # IoU matrix: tracks x detections
-            iou_mat = np.zeros((len(track_ids), len(det_list)), dtype=float)
-            for i in range(len(track_ids)):
-                for j in range(len(det_list)):
-                    iou_mat[i, j] = iou_xyxy(track_boxes[i], det_boxes[j])
-
-            # Greedy matching (simple, works well enough to start)
-            matched_tracks = set()
-            matched_dets = set()
-
-            while True:
-                if iou_mat.size == 0:
-                    break
-                i, j = np.unravel_index(np.argmax(iou_mat), iou_mat.shape)
-                best = iou_mat[i, j]
-                if best < self.iou_threshold:
-                    break
-
-                tid = track_ids[i]
-                if tid in matched_tracks or j in matched_dets:
-                    iou_mat[i, j] = -1
+        table.time_since_update[:n] += 1
+
+        det_boxes = detections.bbox
+        det_codes = detections.class_code
+        matched_dets = np.zeros(len(det_codes), dtype=bool)
+
+        if n and len(det_codes):
+            # IoU matrix: tracks x detections, cross-class pairs never match
+            iou_mat = iou_matrix(table.bbox[:n], det_boxes)
+            iou_mat[table.class_code[:n, None] != det_codes[None, :]] = -1
+
+            # Greedy matching: best IoU first, each track/detection used once
+            rows, cols = np.nonzero(iou_mat >= self.iou_threshold)
+            order = np.argsort(-iou_mat[rows, cols], kind="stable")
+
+            matched_tracks = np.zeros(n, dtype=bool)
+            track_idx = []
+            det_idx = []
+            for i, j in zip(rows[order].tolist(), cols[order].tolist()):
+                if matched_tracks[i] or matched_dets[j]:
                     continue
-
-                # Assign detection j to track tid
-                bbox_j, _score = det_list[j]
-                tr = self.tracks[tid]
-                tr.bbox = bbox_j.copy()
-                tr.hits += 1
-                tr.time_since_update = 0
-
-                matched_tracks.add(tid)
-                matched_dets.add(j)
-
-                # Prevent reusing this row/col
-                iou_mat[i, :] = -1
-                iou_mat[:, j] = -1
-
-            # Unmatched detections → new tracks
-            for j in range(len(det_list)):
-                if j not in matched_dets:
-                    bbox_j, _score = det_list[j]
-                    self._new_track(label, bbox_j)
+                matched_tracks[i] = True
+                matched_dets[j] = True
+                track_idx.append(i)
+                det_idx.append(j)
+
+            # Assign matched detections to their tracks
+            table.bbox[track_idx] = det_boxes[det_idx]
+            table.hits[track_idx] += 1
+            table.time_since_update[track_idx] = 0
+
+        # Unmatched detections → new tracks
+        new = ~matched_dets
+        k = int(new.sum())
+        table.add(
+            np.arange(self._next_id, self._next_id + k, dtype=np.int64),
+            det_codes[new],
+            det_boxes[new],
+        )
+        self._next_id += k
 
         # Remove dead tracks
-        dead = [tid for tid, tr in self.tracks.items() if tr.time_since_update > self.max_age]
-        for tid in dead:
-            del self.tracks[tid]
-
-        # Build output track list
-        outputs = []
-        for tid, tr in self.tracks.items():
-            # Only output tracks that were seen recently (optional)
-            if tr.time_since_update <= 2:
-                outputs.append({
-                    "track_id": tid,
-                    "label": tr.label,
-                    "bbox": tr.bbox.astype(int),
-                    "hits": tr.hits
-                })
-
-        return outputs
\ No newline at end of file
+        table.remove(table.time_since_update[: table.size] > self.max_age)
+
+        return table.view()
@@ -0,0 +1,50 @@
+from typing import NamedTuple
+import numpy as np
+
+
+# COCO class ids (partial, enough for traffic). The COCO id doubles as the
+# compact class code carried through detection, tracking and analytics.
+CLASS_NAMES = {
+    1: "person",
+    2: "bicycle",
+    3: "car",
+    4: "motorcycle",
+    6: "bus",
+    8: "truck",
+}
+
+PERSON_CODE = 1
+VEHICLE_CODES = np.array([3, 4, 6, 8], dtype=np.int16)  # car, motorcycle, bus, truck
+NUM_CLASS_CODES = max(CLASS_NAMES) + 1
+
+
+class Detections(NamedTuple):
+    """
+    Detections for one frame, stored column-wise:
+      - bbox: (N, 4) int32 xyxy
+      - class_code: (N,) int16 COCO ids
+      - score: (N,) float32
+    """
+    bbox: np.ndarray
+    class_code: np.ndarray
+    score: np.ndarray
+
+    @classmethod
+    def empty(cls) -> "Detections":
+        return cls(
+            bbox=np.zeros((0, 4), dtype=np.int32),
+            class_code=np.zeros(0, dtype=np.int16),
+            score=np.zeros(0, dtype=np.float32),
+        )
+
+
+def grow(arr: np.ndarray, size: int, fill=0) -> np.ndarray:
+    """
+    Return `arr` if it already holds `size` rows, otherwise a larger copy
+    (at least doubled) with the new rows set to `fill`.
+    """
+    if size <= len(arr):
+        return arr
+    new = np.full((max(size, 2 * len(arr)),) + arr.shape[1:], fill, dtype=arr.dtype)
+    new[: len(arr)] = arr
+    return new
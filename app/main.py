@@ -7,6 +7,7 @@ from app.core.ws import manager
 from app.api.health import router as health_router
 from app.api.streams import router as streams_router
 from app.api.metrics import router as metrics_router
+from app.api.preview import router as preview_router
 
 from app.api.ws_metrics import router as ws_router
 
@@ -21,6 +22,7 @@ app = FastAPI(
 app.include_router(health_router, prefix="/api")
 app.include_router(streams_router, prefix="/api")
 app.include_router(metrics_router, prefix="/api")
+app.include_router(preview_router, prefix="/api")
 app.include_router(ws_router)
 
 # -----------------------------
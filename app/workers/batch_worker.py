@@ -0,0 +1,512 @@
+import csv
+import json
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, List, Tuple
+
+import cv2
+import numpy as np
+
+from app.analytics.windows import aggregate_windows
+from app.cv.tracker import IoUTracker, iou_matrix
+from app.cv.utils import CLASS_NAMES, NUM_CLASS_CODES, PERSON_CODE, VEHICLE_CODES, grow
+
+VIDEO_EXTENSIONS = {".mp4", ".avi", ".mov", ".mkv", ".m4v"}
+
+
+# ----------------------------------------------------------------------
+# Planning
+# ----------------------------------------------------------------------
+@dataclass
+class Segment:
+    video_path: str
+    index: int
+    start: int            # first frame owned by this segment
+    end: int              # first frame owned by the next segment
+    stop: int             # last frame read + 1 (end + overlap, capped)
+    overlap: int          # frames shared with each neighbouring segment
+    fps: float
+    frame_interval: int
+
+
+def find_videos(paths: Iterable[str]) -> List[Tuple[Path, str]]:
+    """
+    Collect videos from files and (recursively) directories.
+    Returns (path, report name) pairs; names are built from the path
+    relative to the directory given and are unique across the batch.
+    """
+    videos = []
+    used = set()
+    for p in map(Path, paths):
+        if p.is_dir():
+            found = [
+                (f, "__".join(f.relative_to(p).with_suffix("").parts))
+                for f in sorted(p.rglob("*"))
+                if f.suffix.lower() in VIDEO_EXTENSIONS
+            ]
+        elif p.exists():
+            found = [(p, p.stem)]
+        else:
+            raise FileNotFoundError(f"Video not found: {p}")
+
+        for video, name in found:
+            unique, n = name, 1
+            while unique in used:
+                n += 1
+                unique = f"{name}_{n}"
+            used.add(unique)
+            videos.append((video, unique))
+    return videos
+
+
+def plan_segments(
+    video_path: Path,
+    target_fps: int = 5,
+    segment_s: float = 300.0,
+    overlap_s: float = 2.0,
+) -> List[Segment]:
+    """
+    Split a video into time segments that can be analysed independently.
+    Each segment also reads `overlap_s` past its end so tracks crossing
+    the boundary can be matched with the next segment.
+    Videos with an unknown frame count are read as a single segment.
+    """
+    cap = cv2.VideoCapture(str(video_path))
+    if not cap.isOpened():
+        raise RuntimeError(f"Failed to open video: {video_path}")
+    fps = cap.get(cv2.CAP_PROP_FPS) or 25.0
+    total = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    cap.release()
+
+    frame_interval = max(int(fps // target_fps), 1)
+    if total <= 0:
+        # Read until the stream ends
+        return [Segment(
+            video_path=str(video_path),
+            index=0,
+            start=0,
+            end=sys.maxsize,
+            stop=sys.maxsize,
+            overlap=0,
+            fps=fps,
+            frame_interval=frame_interval,
+        )]
+
+    seg_frames = max(int(segment_s * fps), frame_interval)
+    overlap_frames = int(overlap_s * fps)
+
+    segments = []
+    for index, start in enumerate(range(0, total, seg_frames)):
+        end = min(start + seg_frames, total)
+        segments.append(Segment(
+            video_path=str(video_path),
+            index=index,
+            start=start,
+            end=end,
+            stop=min(end + overlap_frames, total),
+            overlap=overlap_frames,
+            fps=fps,
+            frame_interval=frame_interval,
+        ))
+    return segments
+
+
+# ----------------------------------------------------------------------
+# Segment analysis (runs in worker processes)
+# ----------------------------------------------------------------------
+@dataclass
+class SegmentResult:
+    index: int
+    # Frame index after the last frame read
+    stop: int
+    # Per analysed frame owned by this segment
+    times: np.ndarray
+    people: np.ndarray
+    vehicles: np.ndarray
+    # Per track id (NaN first_seen = not seen in the owned range)
+    class_code: np.ndarray
+    first_seen: np.ndarray
+    last_seen: np.ndarray
+    # frame index -> (track ids, class codes, bboxes) in the overlap regions
+    head: Dict[int, Tuple[np.ndarray, np.ndarray, np.ndarray]] = field(default_factory=dict)
+    tail: Dict[int, Tuple[np.ndarray, np.ndarray, np.ndarray]] = field(default_factory=dict)
+
+
+_detector = None
+
+
+def _init_worker(torch_threads: int):
+    global _detector
+    import torch
+    from app.cv.detector import ObjectDetector
+
+    torch.set_num_threads(torch_threads)
+    _detector = ObjectDetector(score_threshold=0.6)
+
+
+def analyze_segment(segment: Segment) -> SegmentResult:
+    cap = cv2.VideoCapture(segment.video_path)
+    if not cap.isOpened():
+        raise RuntimeError(f"Failed to open video: {segment.video_path}")
+    cap.set(cv2.CAP_PROP_POS_FRAMES, segment.start)
+
+    tracker = IoUTracker(iou_threshold=0.3, max_age=20)
+
+    times, people, vehicles = [], [], []
+    class_code = np.zeros(256, dtype=np.int16)
+    first_seen = np.full(256, np.nan)
+    last_seen = np.full(256, np.nan)
+    head, tail = {}, {}
+    head_stop = segment.start + segment.overlap
+    read_until = segment.start
+
+    for idx in range(segment.start, segment.stop):
+        # Only decode frames we run inference on
+        if not cap.grab():
+            break
+        read_until = idx + 1
+        if idx % segment.frame_interval:
+            continue
+        ret, frame = cap.retrieve()
+        if not ret:
+            break
+
+        t = idx / segment.fps
+        tracks = tracker.update(_detector.detect(frame))
+
+        # Tracks matched on this frame
+        live = tracks.time_since_update == 0
+        ids = tracks.track_id[live]
+        codes = tracks.class_code[live]
+        boxes = tracks.bbox[live]
+
+        if segment.index > 0 and idx < head_stop:
+            head[idx] = (ids.copy(), codes.copy(), boxes.copy())
+        if idx >= segment.end:
+            tail[idx] = (ids.copy(), codes.copy(), boxes.copy())
+            continue
+
+        visible_codes = tracks.class_code[tracks.visible]
+        times.append(t)
+        people.append(int(np.count_nonzero(visible_codes == PERSON_CODE)))
+        vehicles.append(int(np.count_nonzero(np.isin(visible_codes, VEHICLE_CODES))))
+
+        if len(ids):
+            size = int(ids.max()) + 1
+            class_code = grow(class_code, size)
+            first_seen = grow(first_seen, size, np.nan)
+            last_seen = grow(last_seen, size, np.nan)
+
+            new_ids = ids[np.isnan(first_seen[ids])]
+            first_seen[new_ids] = t
+            class_code[ids] = codes
+            last_seen[ids] = t
+
+    cap.release()
+
+    return SegmentResult(
+        index=segment.index,
+        stop=read_until,
+        times=np.array(times, dtype=float),
+        people=np.array(people, dtype=int),
+        vehicles=np.array(vehicles, dtype=int),
+        class_code=class_code,
+        first_seen=first_seen,
+        last_seen=last_seen,
+        head=head,
+        tail=tail,
+    )
+
+
+# ----------------------------------------------------------------------
+# Stitching
+# ----------------------------------------------------------------------
+def match_boundary(tail: Dict, head: Dict, iou_threshold: float = 0.5) -> List[Tuple[int, int]]:
+    """
+    Match tracks at the end of one segment (tail) with tracks at the start
+    of the next (head) by their mean IoU over the overlap frames where
+    either track is present, so a track that leaves partway through the
+    overlap can still match.
+    Returns (tail track id, head track id) pairs.
+    """
+    frames = sorted(set(tail) & set(head))
+    if not frames:
+        return []
+
+    a_ids = np.unique(np.concatenate([tail[f][0] for f in frames]))
+    b_ids = np.unique(np.concatenate([head[f][0] for f in frames]))
+    if not len(a_ids) or not len(b_ids):
+        return []
+
+    score = np.zeros((len(a_ids), len(b_ids)), dtype=float)
+    # Frames each track is present in, and frames both are present in
+    present_a = np.zeros(len(a_ids), dtype=int)
+    present_b = np.zeros(len(b_ids), dtype=int)
+    present_both = np.zeros((len(a_ids), len(b_ids)), dtype=int)
+    for f in frames:
+        ia, ca, ba = tail[f]
+        ib, cb, bb = head[f]
+        ra = np.searchsorted(a_ids, ia)
+        rb = np.searchsorted(b_ids, ib)
+        present_a[ra] += 1
+        present_b[rb] += 1
+        if not len(ia) or not len(ib):
+            continue
+        iou = iou_matrix(ba, bb)
+        iou[ca[:, None] != cb[None, :]] = 0.0
+        score[np.ix_(ra, rb)] += iou
+        present_both[np.ix_(ra, rb)] += 1
+
+    # Mean IoU over the frames where either track of the pair is present
+    present_either = present_a[:, None] + present_b[None, :] - present_both
+    score = np.divide(score, present_either, out=np.zeros_like(score), where=present_either > 0)
+
+    # Greedy matching, best overlap first
+    rows, cols = np.nonzero(score >= iou_threshold)
+    order = np.argsort(-score[rows, cols], kind="stable")
+    used_a, used_b = set(), set()
+    pairs = []
+    for i, j in zip(rows[order].tolist(), cols[order].tolist()):
+        if i in used_a or j in used_b:
+            continue
+        used_a.add(i)
+        used_b.add(j)
+        pairs.append((int(a_ids[i]), int(b_ids[j])))
+    return pairs
+
+
+def stitch_tracks(results: List[SegmentResult], iou_threshold: float = 0.5) -> Dict[str, np.ndarray]:
+    """
+    Merge per-segment tracks into video-wide tracks.
+    Returns columns (class_code, first_seen, last_seen), one row per track.
+    """
+    results = sorted(results, key=lambda r: r.index)
+
+    # Union-find over (segment index, track id)
+    parent: Dict[Tuple[int, int], Tuple[int, int]] = {}
+
+    def find(key):
+        parent.setdefault(key, key)
+        while parent[key] != key:
+            parent[key] = parent[parent[key]]
+            key = parent[key]
+        return key
+
+    for prev, nxt in zip(results, results[1:]):
+        for a, b in match_boundary(prev.tail, nxt.head, iou_threshold):
+            parent[find((nxt.index, b))] = find((prev.index, a))
+
+    merged: Dict[Tuple[int, int], List] = {}
+    for r in results:
+        for tid in np.flatnonzero(~np.isnan(r.first_seen)).tolist():
+            root = find((r.index, tid))
+            first, last = float(r.first_seen[tid]), float(r.last_seen[tid])
+            if root in merged:
+                entry = merged[root]
+                entry[1] = min(entry[1], first)
+                entry[2] = max(entry[2], last)
+            else:
+                merged[root] = [int(r.class_code[tid]), first, last]
+
+    rows = list(merged.values())
+    return {
+        "class_code": np.array([r[0] for r in rows], dtype=np.int16),
+        "first_seen": np.array([r[1] for r in rows], dtype=float),
+        "last_seen": np.array([r[2] for r in rows], dtype=float),
+    }
+
+
+# ----------------------------------------------------------------------
+# Reporting
+# ----------------------------------------------------------------------
+def build_report(
+    video_path: Path,
+    name: str,
+    segments: List[Segment],
+    results: List[SegmentResult],
+    window_s: float = 60.0,
+    iou_threshold: float = 0.5,
+) -> Dict:
+    results = sorted(results, key=lambda r: r.index)
+    tracks = stitch_tracks(results, iou_threshold)
+
+    times = np.concatenate([r.times for r in results])
+    people = np.concatenate([r.people for r in results])
+    vehicles = np.concatenate([r.vehicles for r in results])
+
+    is_person = tracks["class_code"] == PERSON_CODE
+    is_vehicle = np.isin(tracks["class_code"], VEHICLE_CODES)
+    dwell = tracks["last_seen"][is_person] - tracks["first_seen"][is_person]
+    per_class = np.bincount(tracks["class_code"][is_vehicle], minlength=NUM_CLASS_CODES)
+
+    return {
+        "video": str(video_path),
+        "name": name,
+        "fps": segments[0].fps,
+        "duration_s": max(r.stop for r in results) / segments[0].fps,
+        "segments": len(segments),
+        "frames_analyzed": int(len(times)),
+        "people": {
+            "unique": int(is_person.sum()),
+            "peak": int(people.max()) if len(people) else 0,
+            "dwell_s": {
+                "avg": float(dwell.mean()) if len(dwell) else 0.0,
+                "median": float(np.median(dwell)) if len(dwell) else 0.0,
+                "p95": float(np.percentile(dwell, 95)) if len(dwell) else 0.0,
+                "max": float(dwell.max()) if len(dwell) else 0.0,
+            },
+        },
+        "vehicles": {
+            "unique": int(is_vehicle.sum()),
+            "peak": int(vehicles.max()) if len(vehicles) else 0,
+            "per_class": {
+                CLASS_NAMES[code]: int(per_class[code])
+                for code in VEHICLE_CODES.tolist()
+                if per_class[code]
+            },
+        },
+        "windows": aggregate_windows(
+            times,
+            people,
+            vehicles,
+            tracks["first_seen"][is_person],
+            tracks["first_seen"][is_vehicle],
+            window_s=window_s,
+        ),
+    }
+
+
+def write_report(report: Dict, output_dir: Path):
+    stem = report["name"]
+    with open(output_dir / f"{stem}.json", "w") as f:
+        json.dump(report, f, indent=2)
+
+    if report["windows"]:
+        with open(output_dir / f"{stem}_windows.csv", "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=list(report["windows"][0]))
+            writer.writeheader()
+            writer.writerows(report["windows"])
+
+
+def write_summary(reports: List[Dict], output_dir: Path, failures: List[Dict] = ()):
+    """
+    One row per video; failed videos get status "failed" and the error.
+    """
+    fieldnames = [
+        "video", "name", "status", "error", "duration_s", "frames_analyzed",
+        "people_unique", "people_peak", "dwell_avg_s", "dwell_max_s",
+        "vehicles_unique", "vehicles_peak",
+    ] + [f"vehicles_{CLASS_NAMES[c]}" for c in VEHICLE_CODES.tolist()]
+
+    with open(output_dir / "summary.csv", "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=fieldnames)
+        writer.writeheader()
+        for r in reports:
+            row = {
+                "video": r["video"],
+                "name": r["name"],
+                "status": "ok",
+                "duration_s": round(r["duration_s"], 2),
+                "frames_analyzed": r["frames_analyzed"],
+                "people_unique": r["people"]["unique"],
+                "people_peak": r["people"]["peak"],
+                "dwell_avg_s": round(r["people"]["dwell_s"]["avg"], 2),
+                "dwell_max_s": round(r["people"]["dwell_s"]["max"], 2),
+                "vehicles_unique": r["vehicles"]["unique"],
+                "vehicles_peak": r["vehicles"]["peak"],
+            }
+            for c in VEHICLE_CODES.tolist():
+                name = CLASS_NAMES[c]
+                row[f"vehicles_{name}"] = r["vehicles"]["per_class"].get(name, 0)
+            writer.writerow(row)
+        for failure in failures:
+            writer.writerow({**failure, "status": "failed"})
+
+
+# ----------------------------------------------------------------------
+# Entry point
+# ----------------------------------------------------------------------
+def run_batch(
+    paths: Iterable[str],
+    output_dir: str,
+    workers: int = 4,
+    torch_threads: int = 1,
+    target_fps: int = 5,
+    segment_s: float = 300.0,
+    overlap_s: float = 2.0,
+    window_s: float = 60.0,
+    iou_threshold: float = 0.5,
+    on_report=None,
+) -> List[Dict]:
+    """
+    Analyse many videos in parallel:
+    - each video is split into time segments
+    - segments from all videos are spread across a process pool
+      (one detector per worker process)
+    - when all segments of a video are done, tracks are stitched at the
+      segment boundaries and a JSON/CSV report is written
+    - a video that fails is logged and listed in summary.csv; the rest
+      of the batch carries on
+    """
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    videos: Dict[str, Path] = {}
+    plans: Dict[str, List[Segment]] = {}
+    failures: List[Dict] = []
+
+    def fail(name: str, video: Path, exc: Exception):
+        print(f"[ERROR] {video}: {exc}")
+        failures.append({"video": str(video), "name": name, "error": str(exc)})
+
+    # A file that can't be planned or analysed is reported, not fatal
+    for video, name in find_videos(paths):
+        videos[name] = video
+        try:
+            plans[name] = plan_segments(video, target_fps, segment_s, overlap_s)
+        except Exception as exc:
+            fail(name, video, exc)
+
+    reports = []
+    pending: Dict[str, List[SegmentResult]] = {name: [] for name in plans}
+
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_worker,
+        initargs=(torch_threads,),
+    ) as pool:
+        futures = {
+            pool.submit(analyze_segment, seg): name
+            for name, segments in plans.items()
+            for seg in segments
+        }
+
+        for future in as_completed(futures):
+            name = futures[future]
+            if name not in pending:
+                # Another segment of this video already failed
+                continue
+
+            try:
+                pending[name].append(future.result())
+                if len(pending[name]) < len(plans[name]):
+                    continue
+
+                report = build_report(
+                    videos[name], name, plans[name], pending.pop(name),
+                    window_s, iou_threshold,
+                )
+                write_report(report, output_dir)
+            except Exception as exc:
+                pending.pop(name, None)
+                fail(name, videos[name], exc)
+                continue
+
+            reports.append(report)
+            if on_report is not None:
+                on_report(report)
+
+    write_summary(reports, output_dir, failures)
+    return reports
@@ -1,6 +1,8 @@
 import threading
 
+from app.cv.inference import get_inference_server
 from app.cv.pipeline import run_video_pipeline
+from app.core.preview import register_preview
 from app.core.state import STATE
 from app.core.ws import manager
 
@@ -8,15 +10,23 @@ from app.core.ws import manager
 class VideoWorker:
     """
     Background worker that runs the CV pipeline in a separate thread
+    (detection goes through the shared inference server)
     and reports analytics to:
       - shared STATE (REST)
       - WebSocket clients (real-time)
+      - browser preview (MJPEG, only while watched)
     """
 
     def __init__(self):
         self.thread = None
 
-    def start(self, video_path: str):
+    def start(
+        self,
+        video_path: str,
+        preview_fps: float = 5.0,
+        preview_width: int = 640,
+        preview_quality: int = 70,
+    ):
         if STATE["running"]:
             return
 
@@ -36,11 +46,20 @@ class VideoWorker:
 
         def target():
             try:
-                run_video_pipeline(
-                    video_path=video_path,
-                    target_fps=5,
-                    on_update=on_update,
-                )
+                server = get_inference_server()
+                with server.client():
+                    run_video_pipeline(
+                        video_path=video_path,
+                        target_fps=5,
+                        on_update=on_update,
+                        detector=server,
+                        preview=register_preview(
+                            fps=preview_fps,
+                            max_width=preview_width,
+                            jpeg_quality=preview_quality,
+                        ),
+                        display=False,
+                    )
             finally:
                 STATE["running"] = False
 
@@ -0,0 +1,18 @@
+// Live preview: the MJPEG connection is only open while the preview is shown,
+// so the backend stops rendering as soon as nobody is watching.
+const PREVIEW_URL = "/api/preview/default";
+
+function togglePreview() {
+    const img = document.getElementById("preview");
+    const button = document.getElementById("preview-toggle");
+
+    if (img.getAttribute("src")) {
+        img.removeAttribute("src");
+        img.style.display = "none";
+        button.innerText = "Show Live Preview";
+    } else {
+        img.src = PREVIEW_URL;
+        img.style.display = "block";
+        button.innerText = "Hide Live Preview";
+    }
+}
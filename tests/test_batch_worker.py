@@ -0,0 +1,116 @@
+import numpy as np
+
+from app.workers.batch_worker import SegmentResult, find_videos, match_boundary, stitch_tracks
+
+PERSON = 1
+CAR = 3
+
+
+def obs(*tracks):
+    """(track id, class code, bbox) tuples -> one overlap frame entry."""
+    ids = np.array([t[0] for t in tracks], dtype=np.int64)
+    codes = np.array([t[1] for t in tracks], dtype=np.int16)
+    boxes = np.array([t[2] for t in tracks], dtype=np.int32).reshape(-1, 4)
+    return ids, codes, boxes
+
+
+def segment(index, tracks, head=None, tail=None):
+    """tracks: {track id: (class code, first_seen, last_seen)}"""
+    size = max(tracks) + 1
+    class_code = np.zeros(size, dtype=np.int16)
+    first_seen = np.full(size, np.nan)
+    last_seen = np.full(size, np.nan)
+    for tid, (code, first, last) in tracks.items():
+        class_code[tid] = code
+        first_seen[tid] = first
+        last_seen[tid] = last
+    return SegmentResult(
+        index=index,
+        stop=0,
+        times=np.zeros(0),
+        people=np.zeros(0, dtype=int),
+        vehicles=np.zeros(0, dtype=int),
+        class_code=class_code,
+        first_seen=first_seen,
+        last_seen=last_seen,
+        head=head or {},
+        tail=tail or {},
+    )
+
+
+BOX = [10, 10, 50, 90]
+OTHER_BOX = [200, 10, 240, 90]
+
+
+def test_match_boundary_pairs_overlapping_tracks():
+    tail = {100: obs((7, PERSON, BOX), (8, CAR, OTHER_BOX)), 105: obs((7, PERSON, BOX))}
+    head = {100: obs((2, CAR, OTHER_BOX), (1, PERSON, BOX)), 105: obs((1, PERSON, BOX))}
+
+    assert sorted(match_boundary(tail, head)) == [(7, 1), (8, 2)]
+
+
+def test_match_boundary_never_merges_different_classes():
+    tail = {100: obs((7, PERSON, BOX))}
+    head = {100: obs((1, CAR, BOX))}
+
+    assert match_boundary(tail, head) == []
+
+
+def test_track_crossing_boundary_becomes_one_identity():
+    first = segment(0, {1: (PERSON, 0.0, 9.8)}, tail={100: obs((1, PERSON, BOX))})
+    second = segment(1, {4: (PERSON, 10.0, 15.0)}, head={100: obs((4, PERSON, BOX))})
+
+    tracks = stitch_tracks([second, first])
+
+    assert len(tracks["class_code"]) == 1
+    assert tracks["first_seen"][0] == 0.0
+    assert tracks["last_seen"][0] == 15.0
+
+
+def test_chain_across_three_segments():
+    a = segment(0, {1: (PERSON, 0.0, 9.8), 2: (CAR, 1.0, 2.0)}, tail={100: obs((1, PERSON, BOX))})
+    b = segment(
+        1, {3: (PERSON, 10.0, 19.8)},
+        head={100: obs((3, PERSON, BOX))},
+        tail={200: obs((3, PERSON, OTHER_BOX))},
+    )
+    c = segment(2, {5: (PERSON, 20.0, 39.8)}, head={200: obs((5, PERSON, OTHER_BOX))})
+
+    tracks = stitch_tracks([a, b, c])
+
+    person = tracks["class_code"] == PERSON
+    assert person.sum() == 1
+    assert (tracks["class_code"] == CAR).sum() == 1
+    assert tracks["last_seen"][person][0] - tracks["first_seen"][person][0] == 39.8
+
+
+def test_find_videos_names_are_unique(tmp_path):
+    for sub in ("a", "b"):
+        (tmp_path / sub).mkdir()
+        (tmp_path / sub / "cam.mp4").touch()
+
+    names = [name for _video, name in find_videos([str(tmp_path), str(tmp_path / "a" / "cam.mp4")])]
+
+    assert names == ["a__cam", "b__cam", "cam"]
+    assert len(find_videos([str(tmp_path / "a"), str(tmp_path / "b")])) == 2
+    assert [n for _v, n in find_videos([str(tmp_path / "a"), str(tmp_path / "b")])] == ["cam", "cam_2"]
+
+
+def test_track_leaving_partway_through_overlap_still_matches():
+    # Present in 2 of 10 overlap frames, other frames have no detections
+    tail = {f: obs() for f in range(100, 110)}
+    head = {f: obs() for f in range(100, 110)}
+    for f in (100, 101):
+        tail[f] = obs((7, PERSON, BOX))
+        head[f] = obs((1, PERSON, BOX))
+
+    assert match_boundary(tail, head) == [(7, 1)]
+
+
+def test_track_missing_from_one_side_lowers_score():
+    # Tail track present in all frames, head track only in the first of four
+    tail = {f: obs((7, PERSON, BOX)) for f in range(100, 104)}
+    head = {f: obs() for f in range(100, 104)}
+    head[100] = obs((1, PERSON, BOX))
+
+    assert match_boundary(tail, head) == []
@@ -0,0 +1,73 @@
+import threading
+import time
+
+import numpy as np
+
+from app.cv.inference import InferenceServer
+from app.cv.utils import Detections
+
+
+class FakeDetector:
+    def __init__(self, delay: float = 0.05):
+        self.delay = delay
+
+    def detect_batch(self, frames):
+        time.sleep(self.delay)
+        return [Detections.empty() for _ in frames]
+
+
+def run_streams(server, n_streams, n_frames):
+    def stream():
+        with server.client():
+            for _ in range(n_frames):
+                server.detect(np.zeros((2, 2, 3), dtype=np.uint8), timeout=1.0)
+
+    threads = [threading.Thread(target=stream) for _ in range(n_streams)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+
+def test_closed_loop_streams_reach_full_batches():
+    server = InferenceServer(
+        detector_factory=FakeDetector, max_batch_size=4, max_wait_ms=30.0
+    )
+    server.start()
+    try:
+        run_streams(server, n_streams=4, n_frames=10)
+        sizes = server.stats()["batch_sizes"]
+    finally:
+        server.stop()
+
+    assert sum(size * count for size, count in sizes.items()) == 40
+    # Only the first batch may be split while the streams start up
+    assert sizes.get(4, 0) >= 8
+
+
+def test_single_stream_does_not_wait_for_batch():
+    server = InferenceServer(
+        detector_factory=lambda: FakeDetector(delay=0.0), max_wait_ms=200.0
+    )
+    server.start()
+    try:
+        start = time.monotonic()
+        run_streams(server, n_streams=1, n_frames=5)
+        elapsed = time.monotonic() - start
+    finally:
+        server.stop()
+
+    assert elapsed < 0.5
+
+
+def test_submit_after_stop_is_rejected():
+    server = InferenceServer(detector_factory=FakeDetector)
+    server.start()
+    server.stop()
+
+    try:
+        server.submit(np.zeros((2, 2, 3), dtype=np.uint8))
+    except RuntimeError:
+        pass
+    else:
+        raise AssertionError("submit() accepted a request after stop()")
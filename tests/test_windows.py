@@ -0,0 +1,48 @@
+import numpy as np
+
+from app.analytics.windows import aggregate_windows
+
+
+def test_frames_and_tracks_binned_per_window():
+    times = np.array([0.0, 5.0, 12.0, 31.0])
+    people = np.array([1, 3, 2, 0])
+    vehicles = np.array([0, 1, 4, 2])
+
+    rows = aggregate_windows(
+        times,
+        people,
+        vehicles,
+        person_first_seen=np.array([0.0, 5.0, 12.0]),
+        vehicle_first_seen=np.array([5.0, 31.0]),
+        window_s=10.0,
+    )
+
+    assert [r["window_start_s"] for r in rows] == [0.0, 10.0, 20.0, 30.0]
+    assert [r["frames"] for r in rows] == [2, 1, 0, 1]
+    assert rows[0]["people_avg"] == 2.0
+    assert rows[0]["people_max"] == 3
+    assert [r["people_new"] for r in rows] == [2, 1, 0, 0]
+    assert [r["vehicles_new"] for r in rows] == [1, 0, 0, 1]
+    assert rows[1]["vehicles_max"] == 4
+
+
+def test_empty_window_reports_zeros():
+    rows = aggregate_windows(
+        np.array([0.0, 25.0]),
+        np.array([2, 1]),
+        np.array([1, 1]),
+        person_first_seen=np.array([0.0]),
+        vehicle_first_seen=np.array([0.0]),
+        window_s=10.0,
+    )
+
+    empty = rows[1]
+    assert empty["frames"] == 0
+    assert empty["people_avg"] == 0.0
+    assert empty["people_max"] == 0
+    assert empty["vehicles_new"] == 0
+
+
+def test_no_frames_no_windows():
+    empty = np.zeros(0)
+    assert aggregate_windows(empty, empty, empty, empty, empty) == []